@@ -3,12 +3,13 @@ from __future__ import (
 )
 
 import hashlib
-import hmac
 from io import (
     BytesIO,
 )
 from typing import (
     Generic,
+    Iterable,
+    Self,
 )
 
 from btctoy.codec import (
@@ -17,20 +18,22 @@ from btctoy.codec import (
 from btctoy.crypto.prime import (
     is_prime,
 )
+from btctoy.crypto.secp256k1 import (
+    EC_A,
+    EC_B,
+    EC_PRIME,
+    G_ORDER,
+    G_X,
+    G_Y,
+    double_scalar_mul,
+    scalar_mul,
+    scalar_mul_g,
+    scalar_mul_g_many,
+)
 from btctoy.crypto.types import (
     FieldElementT,
 )
 
-# Secp256k1 ECDSA parameters
-# https://en.bitcoin.it/wiki/Secp256k1
-
-EC_A = 0
-EC_B = 7
-EC_PRIME = 2**256 - 2**32 - 2**9 - 2**8 - 2**7 - 2**6 - 2**4 - 2**0
-G_X = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
-G_Y = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
-G_ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
-
 
 def is_on_elliptic_curve(
     x: FieldElementT, y: FieldElementT, a: FieldElementT, b: FieldElementT
@@ -48,13 +51,48 @@ def hash256(s: bytes) -> bytes:
     return hashlib.sha256(hashlib.sha256(s).digest()).digest()
 
 
+_HMAC_IPAD = bytes(byte ^ 0x36 for byte in range(256))
+_HMAC_OPAD = bytes(byte ^ 0x5C for byte in range(256))
+
+
+class _HmacSha256:
+    """HMAC-SHA256 (RFC 2104) for a fixed key: the sha256 states after
+    absorbing the padded key are computed once and copied for each message"""
+
+    def __init__(self, key: bytes) -> None:
+        if len(key) > 64:
+            key = hashlib.sha256(key).digest()
+        block = key.ljust(64, b"\x00")
+        self._inner = hashlib.sha256(block.translate(_HMAC_IPAD))
+        self._outer = hashlib.sha256(block.translate(_HMAC_OPAD))
+
+    def digest(self, msg: bytes) -> bytes:
+        inner = self._inner.copy()
+        inner.update(msg)
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+        return outer.digest()
+
+
+_HMAC_ZERO_KEY = _HmacSha256(b"\x00" * 32)
+
+
+# Primes already validated by ModularFieldInteger, so that arithmetic results
+# do not go through is_prime again
+_PRIME_CACHE: set[int] = set()
+
+
 class ModularFieldInteger:
+    __slots__ = ("value", "prime")
+
     value: int
     prime: int
 
     def __init__(self, value: int, prime: int) -> None:
-        if is_prime(prime) is False:
-            raise ValueError(f"{prime} is not a prime integer")
+        if prime not in _PRIME_CACHE:
+            if is_prime(prime) is False:
+                raise ValueError(f"{prime} is not a prime integer")
+            _PRIME_CACHE.add(prime)
         self.value = value % prime
         self.prime = prime
 
@@ -96,7 +134,9 @@ class ModularFieldInteger:
     def __truediv__(self, other: ModularFieldInteger) -> ModularFieldInteger:
         if self.prime != other.prime:
             raise TypeError("Cannot divide two numbers in different Fields")
-        value = (self.value * pow(other.value, self.prime - 2, self.prime)) % self.prime
+        # pow(x, -1, p) inverts with an extended gcd, which is several times
+        # cheaper than Fermat's x**(p-2)
+        value = (self.value * pow(other.value, -1, self.prime)) % self.prime
         return self.__class__(value, self.prime)
 
     def __rmul__(self, coefficient: int) -> ModularFieldInteger:
@@ -105,6 +145,8 @@ class ModularFieldInteger:
 
 
 class EllipcCurvePoint(Generic[FieldElementT]):
+    __slots__ = ("x", "y", "a", "b")
+
     x: FieldElementT
     y: FieldElementT
     a: FieldElementT
@@ -134,6 +176,24 @@ class EllipcCurvePoint(Generic[FieldElementT]):
         if is_on_elliptic_curve(x, y, a, b) is False:
             raise ValueError(f"({x}, {y}) is not on the elliptic curve")
 
+    @classmethod
+    def _unchecked(
+        cls,
+        x: FieldElementT | None,
+        y: FieldElementT | None,
+        a: FieldElementT,
+        b: FieldElementT,
+    ) -> Self:
+        # Bypasses __init__ and its checks: only meant for points computed by
+        # the curve arithmetic itself, which are on the curve by construction
+        point = object.__new__(cls)
+        point.a = a
+        point.b = b
+        # None coordinates stand for the point at infinity, as in __init__
+        point.x = x  # type: ignore[assignment]
+        point.y = y  # type: ignore[assignment]
+        return point
+
     def __eq__(self, other: EllipcCurvePoint[FieldElementT]) -> bool:
         return (
             self.x == other.x
@@ -162,61 +222,72 @@ class EllipcCurvePoint(Generic[FieldElementT]):
             raise TypeError(
                 "Points {}, {} are not on the same curve".format(self, other)
             )
+        # Coordinates are bound to locals once, they are used several times
+        sx, sy, ox, oy = self.x, self.y, other.x, other.y
+
         # Case 0.0: self is the point at infinity, return other
-        if self.x is None:
+        if sx is None:
             return other
         # Case 0.1: other is the point at infinity, return self
-        if other.x is None:
+        if ox is None:
             return self
 
         # Case 1: self.x == other.x, self.y != other.y
         # Result is point at infinity
-        if self.x == other.x and self.y != other.y:
-            return self.__class__(None, None, self.a, self.b)
+        if sx == ox and sy != oy:
+            return self._unchecked(None, None, self.a, self.b)
 
         # Case 2: self.x ≠ other.x
         # Formula (x3,y3)==(x1,y1)+(x2,y2)
         # s=(y2-y1)/(x2-x1)
         # x3=s**2-x1-x2
         # y3=s*(x1-x3)-y1
-        if self.x != other.x:
-            s = (other.y - self.y) / (other.x - self.x)
-            x = s**2 - self.x - other.x
-            y = s * (self.x - x) - self.y
-            return self.__class__(x, y, self.a, self.b)
+        if sx != ox:
+            s = (oy - sy) / (ox - sx)
+            x = s * s - sx - ox
+            y = s * (sx - x) - sy
+            return self._unchecked(x, y, self.a, self.b)
+
+        # Past the cases above, self == other
 
         # Case 4: if we are tangent to the vertical line,
         # we return the point at infinity
         # note instead of figuring out what 0 is for each type
         # we just use 0 * self.x
-        if self == other and self.y == 0 * self.x:
-            return self.__class__(None, None, self.a, self.b)
+        if sy == 0 * sx:
+            return self._unchecked(None, None, self.a, self.b)
 
         # Case 3: self == other
         # Formula (x3,y3)=(x1,y1)+(x1,y1)
         # s=(3*x1**2+a)/(2*y1)
         # x3=s**2-2*x1
         # y3=s*(x1-x3)-y1
-        if self == other:
-            s = (3 * self.x**2 + self.a) / (2 * self.y)
-            x = s**2 - 2 * self.x
-            y = s * (self.x - x) - self.y
-            return self.__class__(x, y, self.a, self.b)
+        # Additions replace the 3 * and 2 * products and x1**2 is computed
+        # once, so that each step stays a single field operation
+        x1_sq = sx * sx
+        s = (x1_sq + x1_sq + x1_sq + self.a) / (sy + sy)
+        x = s * s - sx - sx
+        y = s * (sx - x) - sy
+        return self._unchecked(x, y, self.a, self.b)
 
     def __rmul__(self, coefficient: int) -> EllipcCurvePoint[FieldElementT]:
-        # Implementation of fast scalar product
-        coef = coefficient
-        current = self
-        result = self.__class__(None, None, self.a, self.b)
-        while coef:
-            if coef & 1:
-                result += current
-            current += current
-            coef >>= 1
-        return result
+        # Montgomery ladder: one addition and one doubling per bit whatever its
+        # value, with the invariant r1 - r0 == self
+        r0 = self._unchecked(None, None, self.a, self.b)
+        r1 = self
+        for i in reversed(range(coefficient.bit_length())):
+            if (coefficient >> i) & 1:
+                r0 = r0 + r1
+                r1 = r1 + r1
+            else:
+                r1 = r0 + r1
+                r0 = r0 + r0
+        return r0
 
 
 class S256Integer(ModularFieldInteger):
+    __slots__ = ()
+
     def __init__(self, value: int, prime: int = EC_PRIME) -> None:
         if prime != EC_PRIME:
             raise ValueError(
@@ -224,9 +295,49 @@ class S256Integer(ModularFieldInteger):
             )
         super().__init__(value=value, prime=prime)
 
+    @classmethod
+    def _from_reduced(cls, value: int) -> S256Integer:
+        # Bypasses __init__ and its checks: value must be in [0, EC_PRIME)
+        result = object.__new__(cls)
+        result.value = value
+        result.prime = EC_PRIME
+        return result
+
     def __repr__(self) -> str:
         return f"{self.value:064x}"
 
+    # Fast paths for operations between two S256Integer: both operands are
+    # known to live in F_EC_PRIME, so the field check and the construction
+    # checks are skipped. Any other operand goes through the generic checks.
+
+    def __add__(self, other: ModularFieldInteger) -> ModularFieldInteger:
+        if other.__class__ is not S256Integer:
+            return super().__add__(other)
+        return self._from_reduced((self.value + other.value) % EC_PRIME)
+
+    def __sub__(self, other: ModularFieldInteger) -> ModularFieldInteger:
+        if other.__class__ is not S256Integer:
+            return super().__sub__(other)
+        return self._from_reduced((self.value - other.value) % EC_PRIME)
+
+    def __mul__(self, other: ModularFieldInteger) -> ModularFieldInteger:
+        if other.__class__ is not S256Integer:
+            return super().__mul__(other)
+        return self._from_reduced(self.value * other.value % EC_PRIME)
+
+    def __pow__(self, exponent: int) -> ModularFieldInteger:
+        n = exponent % (EC_PRIME - 1)
+        return self._from_reduced(pow(self.value, n, EC_PRIME))
+
+    def __truediv__(self, other: ModularFieldInteger) -> ModularFieldInteger:
+        if other.__class__ is not S256Integer:
+            return super().__truediv__(other)
+        inverse = pow(other.value, -1, EC_PRIME)
+        return self._from_reduced(self.value * inverse % EC_PRIME)
+
+    def __rmul__(self, coefficient: int) -> ModularFieldInteger:
+        return self._from_reduced(self.value * coefficient % EC_PRIME)
+
     def sqrt(self) -> ModularFieldInteger:
         return self ** ((EC_PRIME + 1) // 4)
 
@@ -236,6 +347,18 @@ B = S256Integer(EC_B)
 
 
 class S256Point(EllipcCurvePoint[ModularFieldInteger]):
+    __slots__ = (
+        "_sec_compressed",
+        "_sec_uncompressed",
+        "_h160_compressed",
+        "_h160_uncompressed",
+    )
+
+    _sec_compressed: bytes | None
+    _sec_uncompressed: bytes | None
+    _h160_compressed: bytes | None
+    _h160_uncompressed: bytes | None
+
     def __init__(
         self,
         x: int | S256Integer | None,
@@ -243,16 +366,36 @@ class S256Point(EllipcCurvePoint[ModularFieldInteger]):
         a: S256Integer = A,
         b: S256Integer = B,
     ) -> None:
-        if a != A:
+        # a and b are nearly always the A and B singletons themselves
+        if a is not A and a != A:
             raise ValueError(f"S256Integer only supports A={A} for a")
-        if b != B:
+        if b is not B and b != B:
             raise ValueError(f"S256Integer only supports B={B} for b")
         super().__init__(
-            x=None if x is None else S256Integer(x) if isinstance(x, int) else x,
-            y=None if y is None else S256Integer(y) if isinstance(x, int) else y,
+            x=S256Integer(x) if isinstance(x, int) else x,
+            y=S256Integer(y) if isinstance(y, int) else y,
             a=A,
             b=B,
         )
+        self._clear_caches()
+
+    @classmethod
+    def _unchecked(
+        cls,
+        x: ModularFieldInteger | None,
+        y: ModularFieldInteger | None,
+        a: ModularFieldInteger,
+        b: ModularFieldInteger,
+    ) -> Self:
+        point = super()._unchecked(x, y, a, b)
+        point._clear_caches()
+        return point
+
+    def _clear_caches(self) -> None:
+        self._sec_compressed = None
+        self._sec_uncompressed = None
+        self._h160_compressed = None
+        self._h160_uncompressed = None
 
     def __repr__(self) -> str:
         if self.x is None:
@@ -262,39 +405,67 @@ class S256Point(EllipcCurvePoint[ModularFieldInteger]):
 
     def __rmul__(self, coefficient: int) -> S256Point:
         coef = coefficient % G_ORDER
-        return super().__rmul__(coef)
+        if self.x is None:
+            return self._unchecked(None, None, A, B)
+        if self is G:
+            # k * G in PrivateKey and in sign/verify goes through the
+            # precomputed generator table. This trades the fixed workload of
+            # the Montgomery ladder for speed: the table walk skips zero
+            # windows and indexes the table with the scalar nibbles, so its
+            # timing depends on the (secret) scalar. Only k * P for other
+            # points keeps the ladder and its masked register selection.
+            result = scalar_mul_g(coef)
+        else:
+            result = scalar_mul(coef, (self.x.value, self.y.value))
+        if result is None:
+            return self._unchecked(None, None, A, B)
+        x, y = result
+        return self._unchecked(
+            S256Integer._from_reduced(x), S256Integer._from_reduced(y), A, B
+        )
 
     def verify(self, z: int, sig: Signature) -> bool:
-        s_inv = pow(sig.s, G_ORDER - 2, G_ORDER)
+        sig_r, sig_s = sig.r, sig.s
+        if self.x is None or sig_s % G_ORDER == 0:
+            return False
+        s_inv = pow(sig_s, -1, G_ORDER)
         u = z * s_inv % G_ORDER
-        v = sig.r * s_inv % G_ORDER
-        total = u * G + v * self
-        return total.x.value == sig.r
+        v = sig_r * s_inv % G_ORDER
+        # u * G + v * self in a single pass
+        total = double_scalar_mul(u, (G_X, G_Y), v, (self.x.value, self.y.value))
+        if total is None:
+            return False
+        return total[0] == sig_r
 
     def sec(self, compressed: bool = True) -> bytes:
         """returns the binary version of the SEC format"""
-        # TODO implementer la fonction
+        # Points never change, so each encoding is computed once
         if compressed:
-            # if compressed, starts with b'\x02' if self.y.value is even, b'\x03' if self.y is odd
-            # then self.x.value
-            # remember, you have to convert self.x.value and self.y.value to binary (some_integer.to_bytes(32, 'big'))
-            if self.y.value % 2 == 0:
-                return b"\x02" + self.x.value.to_bytes(32, "big")
-            else:
-                return b"\x03" + self.x.value.to_bytes(32, "big")
-            # pass
-        else:
-            # if non-compressed, starts with b'\x04' followod by self.x and then self.y
-            return (
-                b"\x04"
-                + self.x.value.to_bytes(32, "big")
-                + self.y.value.to_bytes(32, "big")
+            if self._sec_compressed is None:
+                # starts with b'\x02' if self.y.value is even, b'\x03' if it
+                # is odd, then self.x.value
+                if self.y.value % 2 == 0:
+                    prefix = b"\x02"
+                else:
+                    prefix = b"\x03"
+                self._sec_compressed = prefix + self.x.value.to_bytes(32, "big")
+            return self._sec_compressed
+        if self._sec_uncompressed is None:
+            # starts with b'\x04' followed by self.x and then self.y
+            xv, yv = self.x.value, self.y.value
+            self._sec_uncompressed = (
+                b"\x04" + xv.to_bytes(32, "big") + yv.to_bytes(32, "big")
             )
-            _# pass
-
+        return self._sec_uncompressed
 
     def hash160(self, compressed: bool = True) -> bytes:
-        return hash160(self.sec(compressed))
+        if compressed:
+            if self._h160_compressed is None:
+                self._h160_compressed = hash160(self.sec(compressed=True))
+            return self._h160_compressed
+        if self._h160_uncompressed is None:
+            self._h160_uncompressed = hash160(self.sec(compressed=False))
+        return self._h160_uncompressed
 
     def address(self, compressed: bool = True, testnet: bool = False) -> str:
         h160 = self.hash160(compressed)
@@ -331,19 +502,20 @@ class Signature:
         return f"Signature(r={self.r}, s={self.s})"
 
     def der(self) -> bytes:
-        rbin = self.r.to_bytes(32, byteorder="big")
-        # remove all null bytes at the beginning
-        rbin = rbin.lstrip(b"\x00")
-
-        if rbin[0] & 0x80:
-            rbin = b"\x00" + rbin
-        result = bytes([2, len(rbin)]) + rbin  # <1>
-        sbin = self.s.to_bytes(32, byteorder="big")
-        sbin = sbin.lstrip(b"\x00")
-        if sbin[0] & 0x80:
-            sbin = b"\x00" + sbin
-        result += bytes([2, len(sbin)]) + sbin
-        return bytes([0x30, len(result)]) + result
+        # (bit_length + 8) // 8 bytes is the shortest big endian encoding that
+        # keeps a null byte in front when the high bit is set, as DER requires
+        rbin = self.r.to_bytes((self.r.bit_length() + 8) // 8, byteorder="big")
+        sbin = self.s.to_bytes((self.s.bit_length() + 8) // 8, byteorder="big")
+        rlength = len(rbin)
+        slength = len(sbin)
+        return b"".join(
+            (
+                bytes([0x30, rlength + slength + 4, 2, rlength]),
+                rbin,
+                bytes([2, slength]),
+                sbin,
+            )
+        )
 
     @classmethod
     def parse(cls, signature_bin: bytes) -> Signature:
@@ -371,11 +543,19 @@ class Signature:
 
 class PrivateKey:
     secret: int
-    point: S256Point
+    _point: S256Point | None
 
     def __init__(self, secret: int) -> None:
         self.secret = secret
-        self.point = secret * G
+        # The public point is only computed when first needed: hex(), wif()
+        # and sign() do not use it
+        self._point = None
+
+    @property
+    def point(self) -> S256Point:
+        if self._point is None:
+            self._point = self.secret * G
+        return self._point
 
     def hex(self) -> str:  # noqa: A003
         return f"{self.secret:064x}"
@@ -383,31 +563,31 @@ class PrivateKey:
     def sign(self, z: int) -> Signature:
         k = self.deterministic_k(z)
         r = (k * G).x.value
-        k_inv = pow(k, G_ORDER - 2, G_ORDER)
+        k_inv = pow(k, -1, G_ORDER)
         s = (z + r * self.secret) * k_inv % G_ORDER
         if s > G_ORDER / 2:
             s = G_ORDER - s
         return Signature(r, s)
 
     def deterministic_k(self, z: int) -> int:
-        k = b"\x00" * 32
         v = b"\x01" * 32
         if z > G_ORDER:
             z -= G_ORDER
         z_bytes = z.to_bytes(32, "big")
         secret_bytes = self.secret.to_bytes(32, "big")
-        s256 = hashlib.sha256
-        k = hmac.new(k, v + b"\x00" + secret_bytes + z_bytes, s256).digest()
-        v = hmac.new(k, v, s256).digest()
-        k = hmac.new(k, v + b"\x01" + secret_bytes + z_bytes, s256).digest()
-        v = hmac.new(k, v, s256).digest()
+        # Each k is used for two or three HMACs, so its key states are set up
+        # once; the initial all-zero k is set up at import
+        k = _HmacSha256(_HMAC_ZERO_KEY.digest(v + b"\x00" + secret_bytes + z_bytes))
+        v = k.digest(v)
+        k = _HmacSha256(k.digest(v + b"\x01" + secret_bytes + z_bytes))
+        v = k.digest(v)
         while True:
-            v = hmac.new(k, v, s256).digest()
+            v = k.digest(v)
             candidate = int.from_bytes(v, "big")
             if candidate >= 1 and candidate < G_ORDER:
                 return candidate
-            k = hmac.new(k, v + b"\x00", s256).digest()
-            v = hmac.new(k, v, s256).digest()
+            k = _HmacSha256(k.digest(v + b"\x00"))
+            v = k.digest(v)
 
     def wif(self, compressed: bool = True, testnet: bool = False) -> str:
         secret_bytes = self.secret.to_bytes(32, "big")
@@ -420,3 +600,26 @@ class PrivateKey:
         else:
             suffix = b""
         return encode_base58_checksum(prefix + secret_bytes + suffix)
+
+
+def derive_addresses(
+    secrets: Iterable[int], compressed: bool = True, testnet: bool = False
+) -> list[str]:
+    """PrivateKey(secret).point.address(compressed, testnet) for each secret,
+    sharing one field inversion across the batch"""
+    if testnet:
+        prefix = b"\x6f"
+    else:
+        prefix = b"\x00"
+    addresses = []
+    for point in scalar_mul_g_many(secret % G_ORDER for secret in secrets):
+        if point is None:
+            raise ValueError("Secrets cannot be a multiple of G_ORDER")
+        x, y = point
+        public_point = S256Point._unchecked(
+            S256Integer._from_reduced(x), S256Integer._from_reduced(y), A, B
+        )
+        addresses.append(
+            encode_base58_checksum(prefix + public_point.hash160(compressed))
+        )
+    return addresses
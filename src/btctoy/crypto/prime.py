@@ -1,10 +1,28 @@
 from functools import (
     lru_cache,
 )
+from typing import (
+    Iterable,
+)
+
+try:
+    from gmpy2 import is_prime as gmpy2_is_prime
+except ImportError:  # gmpy2 is an optional, GMP backed, accelerator
+    gmpy2_is_prime = None
+
+# Testing against the first 12 primes as bases makes Miller-Rabin deterministic
+# for every n below this bound
+# See https://oeis.org/A014233
+DETERMINISTIC_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+DETERMINISTIC_BOUND = 318665857834031151167461
 
 
 @lru_cache
 def is_prime(n: int) -> bool:
+    if gmpy2_is_prime is not None:
+        return bool(gmpy2_is_prime(n, 40))
+    if n < DETERMINISTIC_BOUND:
+        return miller_rabin_with_bases(n, DETERMINISTIC_BASES)
     return miller_rabin(n, 40)
 
 
@@ -15,6 +33,13 @@ def miller_rabin(n: int, k: int) -> bool:
     # The optimal number of rounds for this test is 40
     # See http://stackoverflow.com/questions/6325576/how-many-iterations-of-rabin-miller-should-i-use-for-cryptographic-safe-primes
     # for justification
+    # The bases are drawn lazily: miller_rabin_with_bases returns for n <= 3
+    # before consuming them, so randrange always has a non-empty range
+    bases = (random.randrange(2, n - 1) for _ in range(k))  # noqa: S311
+    return miller_rabin_with_bases(n, bases)
+
+
+def miller_rabin_with_bases(n: int, bases: Iterable[int]) -> bool:
     # If number is even, it's a composite number
 
     if n <= 1:
@@ -30,8 +55,10 @@ def miller_rabin(n: int, k: int) -> bool:
     while s % 2 == 0:
         r += 1
         s //= 2
-    for _ in range(k):
-        a = random.randrange(2, n - 1)  # noqa: S311
+    for a in bases:
+        if a % n == 0:
+            # only happens for a prime base dividing n, i.e. n == a
+            continue
         x = pow(a, s, n)
         if x == 1 or x == n - 1:
             continue
@@ -0,0 +1,238 @@
+from typing import (
+    Iterable,
+)
+
+# Secp256k1 ECDSA parameters
+# https://en.bitcoin.it/wiki/Secp256k1
+
+EC_A = 0
+EC_B = 7
+EC_PRIME = 2**256 - 2**32 - 2**9 - 2**8 - 2**7 - 2**6 - 2**4 - 2**0
+G_X = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
+G_Y = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
+G_ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+# Points are handled here as raw int coordinates, which keeps the scalar
+# multiplication loop away from the ModularFieldInteger / EllipcCurvePoint
+# method dispatch. Affine points use None for the point at infinity.
+# Jacobian points (X, Y, Z) stand for the affine point (X/Z**2, Y/Z**3) and let
+# additions and doublings skip the field inversion: only the final conversion
+# back to affine coordinates needs one.
+AffinePoint = tuple[int, int] | None
+JacobianPoint = tuple[int, int, int]
+
+INFINITY: JacobianPoint = (1, 1, 0)
+
+
+def to_jacobian(point: AffinePoint) -> JacobianPoint:
+    if point is None:
+        return INFINITY
+    return point[0], point[1], 1
+
+
+def to_affine(point: JacobianPoint) -> AffinePoint:
+    x, y, z = point
+    if z == 0:
+        return None
+    z_inv = pow(z, -1, EC_PRIME)
+    z_inv2 = z_inv * z_inv % EC_PRIME
+    return x * z_inv2 % EC_PRIME, y * z_inv2 * z_inv % EC_PRIME
+
+
+def batch_to_affine(points: list[JacobianPoint]) -> list[AffinePoint]:
+    """to_affine on a list of points, sharing a single field inversion
+    (Montgomery's trick)"""
+    # prefix[i] is the product of the non-zero z of points[:i]
+    prefix = []
+    acc = 1
+    for _, _, z in points:
+        prefix.append(acc)
+        if z != 0:
+            acc = acc * z % EC_PRIME
+    acc_inv = pow(acc, -1, EC_PRIME)
+    result: list[AffinePoint] = [None] * len(points)
+    for i in reversed(range(len(points))):
+        x, y, z = points[i]
+        if z == 0:
+            continue
+        z_inv = acc_inv * prefix[i] % EC_PRIME
+        acc_inv = acc_inv * z % EC_PRIME
+        z_inv2 = z_inv * z_inv % EC_PRIME
+        result[i] = x * z_inv2 % EC_PRIME, y * z_inv2 * z_inv % EC_PRIME
+    return result
+
+
+def jacobian_double(point: JacobianPoint) -> JacobianPoint:
+    # dbl-2009-l formulas, valid for a=0
+    # https://hyperelliptic.org/EFD/g1p/auto-shortw-jacobian-0.html#doubling-dbl-2009-l
+    x1, y1, z1 = point
+    if z1 == 0 or y1 == 0:
+        return INFINITY
+    a = x1 * x1 % EC_PRIME
+    b = y1 * y1 % EC_PRIME
+    c = b * b % EC_PRIME
+    d = 2 * ((x1 + b) ** 2 - a - c) % EC_PRIME
+    e = 3 * a
+    x3 = (e * e - 2 * d) % EC_PRIME
+    y3 = (e * (d - x3) - 8 * c) % EC_PRIME
+    z3 = 2 * y1 * z1 % EC_PRIME
+    return x3, y3, z3
+
+
+def jacobian_add(point: JacobianPoint, other: JacobianPoint) -> JacobianPoint:
+    # add-2007-bl formulas
+    # https://hyperelliptic.org/EFD/g1p/auto-shortw-jacobian-0.html#addition-add-2007-bl
+    x1, y1, z1 = point
+    x2, y2, z2 = other
+    if z1 == 0:
+        return other
+    if z2 == 0:
+        return point
+    z1z1 = z1 * z1 % EC_PRIME
+    z2z2 = z2 * z2 % EC_PRIME
+    u1 = x1 * z2z2 % EC_PRIME
+    u2 = x2 * z1z1 % EC_PRIME
+    s1 = y1 * z2 * z2z2 % EC_PRIME
+    s2 = y2 * z1 * z1z1 % EC_PRIME
+    h = (u2 - u1) % EC_PRIME
+    r = 2 * (s2 - s1) % EC_PRIME
+    if h == 0:
+        if r == 0:
+            return jacobian_double(point)
+        return INFINITY
+    i = 4 * h * h % EC_PRIME
+    j = h * i % EC_PRIME
+    v = u1 * i % EC_PRIME
+    x3 = (r * r - j - 2 * v) % EC_PRIME
+    y3 = (r * (v - x3) - 2 * s1 * j) % EC_PRIME
+    z3 = ((z1 + z2) ** 2 - z1z1 - z2z2) * h % EC_PRIME
+    return x3, y3, z3
+
+
+def jacobian_add_affine(point: JacobianPoint, other: AffinePoint) -> JacobianPoint:
+    # madd-2007-bl formulas, for an affine (z=1) second operand
+    # https://hyperelliptic.org/EFD/g1p/auto-shortw-jacobian-0.html#addition-madd-2007-bl
+    if other is None:
+        return point
+    x1, y1, z1 = point
+    x2, y2 = other
+    if z1 == 0:
+        return x2, y2, 1
+    z1z1 = z1 * z1 % EC_PRIME
+    u2 = x2 * z1z1 % EC_PRIME
+    s2 = y2 * z1 * z1z1 % EC_PRIME
+    h = (u2 - x1) % EC_PRIME
+    r = 2 * (s2 - y1) % EC_PRIME
+    if h == 0:
+        if r == 0:
+            return jacobian_double(point)
+        return INFINITY
+    hh = h * h % EC_PRIME
+    i = 4 * hh
+    j = h * i % EC_PRIME
+    v = x1 * i % EC_PRIME
+    x3 = (r * r - j - 2 * v) % EC_PRIME
+    y3 = (r * (v - x3) - 2 * y1 * j) % EC_PRIME
+    z3 = ((z1 + h) ** 2 - z1z1 - hh) % EC_PRIME
+    return x3, y3, z3
+
+
+def cswap(
+    bit: int, point: JacobianPoint, other: JacobianPoint
+) -> tuple[JacobianPoint, JacobianPoint]:
+    """(other, point) if bit is 1, (point, other) if bit is 0, selected with
+    masks rather than a branch on bit"""
+    mask = -bit  # -1 has all bits set, so mask & t == t when bit is 1
+    x1, y1, z1 = point
+    x2, y2, z2 = other
+    tx = mask & (x1 ^ x2)
+    ty = mask & (y1 ^ y2)
+    tz = mask & (z1 ^ z2)
+    return (x1 ^ tx, y1 ^ ty, z1 ^ tz), (x2 ^ tx, y2 ^ ty, z2 ^ tz)
+
+
+def scalar_mul(coefficient: int, point: AffinePoint) -> AffinePoint:
+    # Montgomery ladder over a fixed 256 bits: every bit costs exactly one
+    # addition and one doubling, with the invariant r1 - r0 == point.
+    # The coefficient is expected to be reduced modulo G_ORDER.
+    # Rather than branching on each bit, the registers are kept swapped
+    # while the current bit is 0, so that the same
+    # "r0 = r0 + r1; r1 = 2 * r1" step applies to both cases.
+    r0 = INFINITY
+    r1 = to_jacobian(point)
+    swapped = 0
+    for i in reversed(range(256)):
+        bit = (coefficient >> i) & 1
+        r0, r1 = cswap(swapped ^ bit ^ 1, r0, r1)
+        swapped = bit ^ 1
+        r0, r1 = jacobian_add(r0, r1), jacobian_double(r1)
+    r0, _ = cswap(swapped, r0, r1)
+    return to_affine(r0)
+
+
+def double_scalar_mul(
+    coefficient: int, point: AffinePoint, other_coefficient: int, other: AffinePoint
+) -> AffinePoint:
+    """coefficient * point + other_coefficient * other, sharing the doublings
+    between both scalars (Straus / Shamir's trick) over 2-bit windows.
+    The coefficients are expected to be reduced modulo G_ORDER."""
+    p1 = to_jacobian(point)
+    p2 = jacobian_double(p1)
+    q1 = to_jacobian(other)
+    q2 = jacobian_double(q1)
+    p_multiples = [INFINITY, p1, p2, jacobian_add(p2, p1)]
+    q_multiples = [INFINITY, q1, q2, jacobian_add(q2, q1)]
+    # table[4 * i + j] == i * point + j * other
+    table = batch_to_affine(
+        [jacobian_add(p_i, q_j) for p_i in p_multiples for q_j in q_multiples]
+    )
+    result = INFINITY
+    for shift in range(254, -2, -2):
+        result = jacobian_double(jacobian_double(result))
+        index = ((coefficient >> shift) & 3) << 2 | ((other_coefficient >> shift) & 3)
+        if index:
+            result = jacobian_add_affine(result, table[index])
+    return to_affine(result)
+
+
+def _build_g_table() -> list[list[AffinePoint]]:
+    # G_TABLE[i][j] == (j + 1) * 16**i * G, for every 4-bit window i of a
+    # 256-bit scalar and every non-zero window value j + 1
+    rows = []
+    base = to_jacobian((G_X, G_Y))
+    for _ in range(64):
+        row = [base]
+        for _ in range(14):
+            row.append(jacobian_add(row[-1], base))
+        rows.append(row)
+        base = jacobian_add(row[-1], base)
+    flat = batch_to_affine([point for row in rows for point in row])
+    return [flat[i : i + 15] for i in range(0, len(flat), 15)]
+
+
+G_TABLE = _build_g_table()
+
+
+def _scalar_mul_g_jacobian(coefficient: int) -> JacobianPoint:
+    result = INFINITY
+    for row in G_TABLE:
+        window = coefficient & 15
+        if window:
+            result = jacobian_add_affine(result, row[window - 1])
+        coefficient >>= 4
+    return result
+
+
+def scalar_mul_g(coefficient: int) -> AffinePoint:
+    """coefficient * G, using the precomputed G_TABLE: one mixed addition per
+    non-zero 4-bit window and no doubling.
+    Unlike scalar_mul, this is not constant time: zero windows are skipped
+    and the table is indexed by the coefficient nibbles.
+    The coefficient is expected to be reduced modulo G_ORDER."""
+    return to_affine(_scalar_mul_g_jacobian(coefficient))
+
+
+def scalar_mul_g_many(coefficients: Iterable[int]) -> list[AffinePoint]:
+    """scalar_mul_g on each coefficient, with a single field inversion shared
+    by the whole batch"""
+    return batch_to_affine([_scalar_mul_g_jacobian(coef) for coef in coefficients])
@@ -1,5 +1,9 @@
+import pytest
+
 from btctoy.crypto import (
+    EC_PRIME,
     ModularFieldInteger,
+    S256Integer,
 )
 
 
@@ -59,3 +63,29 @@ def test_div() -> None:
     a = ModularFieldInteger(4, 31)
     b = ModularFieldInteger(11, 31)
     assert a**-4 * b == ModularFieldInteger(13, 31)
+
+
+def test_not_prime() -> None:
+    with pytest.raises(ValueError, match="is not a prime integer"):
+        ModularFieldInteger(2, 32)
+    # rejected primes are not cached
+    with pytest.raises(ValueError, match="is not a prime integer"):
+        ModularFieldInteger(3, 32)
+
+
+def test_s256_integer() -> None:
+    a = S256Integer(EC_PRIME - 2)
+    b = S256Integer(5)
+    generic_b = ModularFieldInteger(5, EC_PRIME)
+    assert a + b == S256Integer(3)
+    assert a + b == a + generic_b
+    assert a - b == S256Integer(EC_PRIME - 7)
+    assert a * b == S256Integer(-10)
+    assert a / b * b == a
+    assert a**2 == S256Integer(4)
+    assert 3 * b == S256Integer(15)
+    assert isinstance(a * b, S256Integer)
+    with pytest.raises(TypeError, match="different Fields"):
+        a + ModularFieldInteger(5, 31)
+    with pytest.raises(AttributeError):
+        a.other = 1  # type: ignore[attr-defined]
@@ -2,9 +2,12 @@ from secrets import (
     randbelow,
 )
 
+import pytest
+
 from btctoy.crypto import (
     G_ORDER,
     PrivateKey,
+    derive_addresses,
 )
 
 
@@ -28,3 +31,36 @@ def test_wif() -> None:
     pk = PrivateKey(0x1CCA23DE92FD1862FB5B76E5F4F50EB082165E5191E116C18ED1A6B24BE6A53F)
     expected = "cNYfWuhDpbNM1JWc3c6JTrtrFVxU4AGhUKgw5f93NP2QaBqmxKkg"
     assert pk.wif(compressed=True, testnet=True) == expected
+
+
+def test_deterministic_k() -> None:
+    pk = PrivateKey(12345)
+    z = 0x1234567890ABCDEF
+    expected = 0xA4AE215C52AD723609302DEC556AF54EC75C8A6221BF7D3DD7D0AE71443C25ED
+    assert pk.deterministic_k(z) == expected
+
+
+def test_derive_addresses() -> None:
+    secrets = [1, 888**3, 321, 4242424242, G_ORDER + 5, randbelow(G_ORDER - 1) + 1]
+    for compressed in (True, False):
+        for testnet in (True, False):
+            expected = [
+                PrivateKey(secret).point.address(compressed, testnet)
+                for secret in secrets
+            ]
+            assert derive_addresses(secrets, compressed, testnet) == expected
+    assert derive_addresses([]) == []
+    with pytest.raises(ValueError, match="multiple of G_ORDER"):
+        derive_addresses([1, G_ORDER])
+
+
+def test_lazy_point() -> None:
+    pk = PrivateKey(888**3)
+    assert pk.wif() == PrivateKey(888**3).wif()
+    assert pk._point is None
+    point = pk.point
+    assert point is pk.point
+    assert point.address(compressed=True) == "148dY81A9BmdpMhvYEVznrM45kWN32vSCN"
+    # secrets that are multiples of G_ORDER give the point at infinity
+    assert PrivateKey(G_ORDER).point.x is None
+    assert PrivateKey(0).point.x is None
@@ -1,6 +1,11 @@
+import pytest
+
 from btctoy.crypto import (
     G_ORDER,
+    G_X,
+    G_Y,
     G,
+    S256Integer,
     S256Point,
     Signature,
 )
@@ -11,6 +16,16 @@ def test_order() -> None:
     assert point.x is None
 
 
+def test_init() -> None:
+    assert S256Point(S256Integer(G_X), G_Y) == G
+    assert S256Point(G_X, S256Integer(G_Y)) == G
+    assert isinstance(S256Point(S256Integer(G_X), G_Y).y, S256Integer)
+    with pytest.raises(ValueError, match="is not on the elliptic curve"):
+        S256Point(G_X, G_Y + 1)
+    with pytest.raises(ValueError, match="only supports A="):
+        S256Point(G_X, G_Y, a=S256Integer(1))
+
+
 def test_pubpoint() -> None:
     # write a test that tests the public point for the following
     points = (
@@ -58,6 +73,9 @@ def test_verify() -> None:
     r = 0xEFF69EF2B1BD93A66ED5219ADD4FB51E11A840F404876325A1E8FFE0529A2C
     s = 0xC7207FEE197D27C618AEA621406F6BF5EF6FCA38681D82B2F06FDDBDCE6FEAB6
     assert point.verify(z, Signature(r, s))
+    assert point.verify(z, Signature(r, s + 1)) is False
+    assert point.verify(z, Signature(r, 0)) is False
+    assert S256Point(None, None).verify(z, Signature(r, s)) is False
 
 
 def test_sec() -> None:
@@ -100,3 +118,27 @@ def test_address() -> None:
     point = secret * G
     assert point.address(compressed=False, testnet=False) == mainnet_address
     assert point.address(compressed=False, testnet=True) == testnet_address
+
+
+def test_sec_cache() -> None:
+    point = 999**3 * G
+    for compressed in (True, False):
+        assert point.sec(compressed) is point.sec(compressed)
+        assert point.hash160(compressed) is point.hash160(compressed)
+    assert point.sec(compressed=True) != point.sec(compressed=False)
+    assert point.hash160(compressed=True) != point.hash160(compressed=False)
+    fresh = S256Point(point.x.value, point.y.value)
+    assert fresh.sec(compressed=False) == point.sec(compressed=False)
+
+
+def test_der() -> None:
+    sig = Signature(
+        0x814E5EBD4C10E76A6A4BDE338A0739255CF9901D753FD5A517B1558E9D70363B,
+        0x325CB22181872408382384038870EEFB2C557CA02F38FAC45DD37182584BDAB9,
+    )
+    expected = "3045022100814e5ebd4c10e76a6a4bde338a0739255cf9901d753fd5a517b1558e9d70363b0220325cb22181872408382384038870eefb2c557ca02f38fac45dd37182584bdab9"
+    assert sig.der() == bytes.fromhex(expected)
+    for r, s in ((1, 2**255), (2**248, 2**247 - 1), (0, 0x7F)):
+        parsed = Signature.parse(Signature(r, s).der())
+        assert (parsed.r, parsed.s) == (r, s)
+    assert Signature(0x80, 0x7F).der() == bytes.fromhex("30070202008002017f")
@@ -0,0 +1,100 @@
+from btctoy.crypto.secp256k1 import (
+    EC_PRIME,
+    G_ORDER,
+    G_X,
+    G_Y,
+    INFINITY,
+    batch_to_affine,
+    cswap,
+    double_scalar_mul,
+    jacobian_add,
+    jacobian_add_affine,
+    jacobian_double,
+    scalar_mul,
+    scalar_mul_g,
+    scalar_mul_g_many,
+    to_affine,
+    to_jacobian,
+)
+
+G_POINT = (G_X, G_Y)
+
+
+def test_jacobian_conversion() -> None:
+    assert to_affine(to_jacobian(G_POINT)) == G_POINT
+    assert to_affine(to_jacobian(None)) is None
+    # (X, Y, Z) and (l**2 X, l**3 Y, l Z) are the same point
+    scaled = (G_X * 4 % EC_PRIME, G_Y * 8 % EC_PRIME, 2)
+    assert to_affine(scaled) == G_POINT
+
+
+def test_jacobian_add() -> None:
+    g = to_jacobian(G_POINT)
+    g2 = jacobian_double(g)
+    assert to_affine(jacobian_add(g, g)) == to_affine(g2)
+    assert jacobian_add(INFINITY, g) == g
+    assert jacobian_add(g, INFINITY) == g
+    assert jacobian_add(g, to_jacobian((G_X, EC_PRIME - G_Y)))[2] == 0
+    assert to_affine(jacobian_add(g2, g)) == to_affine(jacobian_add(g, g2))
+    assert jacobian_double(INFINITY)[2] == 0
+
+
+def test_scalar_mul() -> None:
+    assert scalar_mul(0, G_POINT) is None
+    assert scalar_mul(1, G_POINT) == G_POINT
+    assert scalar_mul(7, G_POINT) == (
+        0x5CBDF0646E5DB4EAA398F365F2EA7A0E3D419B7E0330E39CE92BDDEDCAC4F9BC,
+        0x6AEBCA40BA255960A3178D6D861A54DBA813D0B813FDE7B5A5082628087264DA,
+    )
+    assert scalar_mul(G_ORDER, G_POINT) is None
+    assert scalar_mul(G_ORDER - 1, G_POINT) == (G_X, EC_PRIME - G_Y)
+
+
+def test_scalar_mul_g() -> None:
+    for coefficient in (0, 1, 15, 16, 2**128 + 7, 2**255, G_ORDER - 1):
+        assert scalar_mul_g(coefficient) == scalar_mul(coefficient, G_POINT)
+
+
+def test_batch_to_affine() -> None:
+    g = to_jacobian(G_POINT)
+    points = [g, jacobian_double(g), INFINITY, jacobian_add(g, jacobian_double(g))]
+    assert batch_to_affine(points) == [to_affine(point) for point in points]
+    assert batch_to_affine([]) == []
+
+
+def test_jacobian_add_affine() -> None:
+    g = to_jacobian(G_POINT)
+    g2 = jacobian_double(g)
+    assert to_affine(jacobian_add_affine(g2, G_POINT)) == to_affine(jacobian_add(g2, g))
+    assert to_affine(jacobian_add_affine(g, G_POINT)) == to_affine(g2)
+    assert jacobian_add_affine(INFINITY, G_POINT) == g
+    assert jacobian_add_affine(g, None) == g
+    assert jacobian_add_affine(g, (G_X, EC_PRIME - G_Y))[2] == 0
+
+
+def test_double_scalar_mul() -> None:
+    other = scalar_mul(1485, G_POINT)
+    for u, v in ((0, 0), (1, 0), (0, 1), (7, 13), (2**255 + 3, G_ORDER - 1)):
+        expected = to_affine(
+            jacobian_add(
+                to_jacobian(scalar_mul(u, G_POINT)), to_jacobian(scalar_mul(v, other))
+            )
+        )
+        assert double_scalar_mul(u, G_POINT, v, other) == expected
+    # 1485 * G - 1485 * G is the point at infinity
+    assert double_scalar_mul(1485, G_POINT, G_ORDER - 1, other) is None
+
+
+def test_cswap() -> None:
+    g = to_jacobian(G_POINT)
+    g2 = jacobian_double(g)
+    assert cswap(0, g, g2) == (g, g2)
+    assert cswap(1, g, g2) == (g2, g)
+    assert cswap(1, INFINITY, g) == (g, INFINITY)
+
+
+def test_scalar_mul_g_many() -> None:
+    coefficients = [0, 1, 16, 2**255, G_ORDER - 1]
+    expected = [scalar_mul_g(coefficient) for coefficient in coefficients]
+    assert scalar_mul_g_many(coefficients) == expected
+    assert scalar_mul_g_many([]) == []
@@ -1,3 +1,7 @@
+import hmac
+
+import pytest
+
 from btctoy.crypto import (
     EC_A,
     EC_B,
@@ -6,9 +10,15 @@ from btctoy.crypto import (
     G_X,
     G_Y,
     ModularFieldInteger,
+    _HmacSha256,
     is_on_elliptic_curve,
     is_prime,
 )
+from btctoy.crypto.prime import (
+    DETERMINISTIC_BASES,
+    miller_rabin,
+    miller_rabin_with_bases,
+)
 
 
 def test_is_prime() -> None:
@@ -22,6 +32,36 @@ def test_is_prime() -> None:
     assert is_prime(EC_PRIME)
     assert is_prime(EC_PRIME + 2) is False
     assert is_prime(G_ORDER)
+    # Carmichael number and strong pseudoprime to base 2
+    assert is_prime(561) is False
+    assert is_prime(2047) is False
+    assert is_prime(2**89 - 1)
+    assert is_prime(2**89 + 1) is False
+
+
+def test_is_prime_gmpy2(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def fake_gmpy2_is_prime(n: int, reps: int) -> bool:
+        calls.append((n, reps))
+        return miller_rabin(n, reps)
+
+    monkeypatch.setattr("btctoy.crypto.prime.gmpy2_is_prime", fake_gmpy2_is_prime)
+    is_prime.cache_clear()
+    try:
+        assert is_prime(EC_PRIME)
+        assert is_prime(561) is False
+    finally:
+        is_prime.cache_clear()
+    assert calls == [(EC_PRIME, 40), (561, 40)]
+
+
+def test_miller_rabin() -> None:
+    primes = [n for n in range(2, 1000) if all(n % d for d in range(2, n))]
+    for n in range(1000):
+        expected = n in primes
+        assert miller_rabin_with_bases(n, DETERMINISTIC_BASES) is expected
+        assert miller_rabin(n, 20) is expected
 
 
 def test_is_on_elliptic_curve() -> None:
@@ -38,3 +78,10 @@ def test_is_on_elliptic_curve() -> None:
         ModularFieldInteger(EC_A, EC_PRIME),
         ModularFieldInteger(EC_B, EC_PRIME),
     )
+
+
+def test_hmac_sha256() -> None:
+    for key in (b"", b"\x00" * 32, b"key", bytes(range(64)), bytes(range(100))):
+        mac = _HmacSha256(key)
+        for msg in (b"", b"message", bytes(97)):
+            assert mac.digest(msg) == hmac.digest(key, msg, "sha256")